@@ -16,15 +16,20 @@ Environment Variables (for --real mode):
 import argparse
 import csv
 import datetime
+import gzip
 import hashlib
 import json
+import math
 import os
 import re
 import sys
 import tempfile
-from io import StringIO
+from dataclasses import dataclass
+from functools import lru_cache
+from io import StringIO, TextIOWrapper
+from json.encoder import encode_basestring
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
@@ -32,43 +37,206 @@ from urllib.error import URLError, HTTPError
 # Constants
 DATA_DIR = Path(__file__).parent.parent / "data"
 ISO_WEEK_FORMAT = "%Y-W%W"
-ISO_WEEK_PATTERN = re.compile(r'^\d{4}-W\d{2}$')
+# ASCII-only: ECDC week labels never contain non-ASCII (Unicode) digits
+ISO_WEEK_PATTERN = re.compile(r'^\d{4}-W\d{2}$', re.ASCII)
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d-%m-%Y")
+
+# Change-detection hash; SHA-256 is hardware-accelerated (SHA extensions)
+# in OpenSSL on current x86/ARM CPUs and outruns BLAKE2b there
+CONTENT_HASH_ALGORITHM = 'sha256'
+
+# Output record fields, in the order they are serialized
+RECORD_KEYS = ('source', 'iso_week', 'country', 'pathogen', 'metric', 'value')
+
+# JSONL line template in RECORD_KEYS order, byte-compatible with json.dumps()
+JSONL_LINE_TEMPLATE = '{' + ', '.join(f'"{key}": %s' for key in RECORD_KEYS) + '}\n'
 
 # Default data source URLs (can be overridden with environment variables)
 DEFAULT_ECDC_URL = "https://raw.githubusercontent.com/EU-ECDC/Respiratory_viruses_weekly_data/main/data/sentinelTestsDetectionsPositivity.csv"
 
+# Accepted ECDC header spellings per standard column, in priority order
+HEADER_VARIANTS = {
+    'country': ('countryname', 'country_name', 'country', 'countrycode'),
+    'pathogen': ('pathogen', 'virus', 'organism'),
+    'yearweek': ('yearweek', 'year_week', 'iso_week', 'week', 'date'),
+    'indicator': ('indicator', 'metric', 'measure'),
+    'value': ('value', 'val', 'number'),
+}
+
+# Mock series: (pathogen, metric, base value, cycle length in weeks, step)
+MOCK_SERIES = (
+    ('influenza', 'positivity_rate', 5.0, 10, 2.5),
+    ('RSV', 'cases', 50.0, 15, 10.0),
+)
+
+# ECDC value normalization tables: exact labels first, then keyword groups
+# checked in order (the first group with a substring match wins)
+ITALY_CODES = frozenset({'IT', 'ITA', 'ITALY'})
+MISSING_VALUES = frozenset({'', 'NA', 'N/A', 'null', 'None'})
+PATHOGEN_KEYWORDS = (
+    (('influenza',), 'influenza'),
+    (('rsv', 'respiratory syncytial'), 'RSV'),
+    (('covid', 'sars', 'cov-2'), 'SARS-CoV-2'),
+)
+INDICATOR_METRICS = {
+    'positivity': 'positivity_rate',
+    'detections': 'cases',
+    'tests': 'tests',
+}
+INDICATOR_KEYWORDS = (
+    (('positivity', 'percent'), 'positivity_rate'),
+    (('detection', 'case', 'positive'), 'cases'),
+    (('test', 'specimen'), 'tests'),
+)
+
+
+class GzipResponse(gzip.GzipFile):
+    """Gzip-decoding view of an HTTP response that also closes the response."""
+
+    def __init__(self, response: BinaryIO):
+        super().__init__(fileobj=response, mode='rb')
+        self.response = response
+        self.headers = response.headers
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self.response.close()
 
-def fetch_csv_text(url: str, timeout: int = 30) -> str:
+
+def open_csv_stream(
+    url: str,
+    timeout: int = 30,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Optional[BinaryIO]:
     """
-    Fetch CSV content from a URL.
+    Open a streaming connection to a CSV URL.
+
+    The request asks for a gzip-compressed transfer; compressed responses
+    are decoded on the fly, so callers always read plain CSV bytes. The
+    returned object is a context manager; callers should use it in a
+    ``with`` block so the connection is closed once parsing is done.
+
+    If ``etag``/``last_modified`` from a previous download are given, the
+    request is made conditional and None is returned when the server
+    answers 304 Not Modified.
 
     Args:
         url: The URL to fetch from
         timeout: Request timeout in seconds
+        etag: ETag of the previously downloaded content
+        last_modified: Last-Modified of the previously downloaded content
 
     Returns:
-        CSV content as string
+        Open binary stream yielding raw CSV bytes (with the response
+        ``headers``), or None if the content is unchanged
 
     Raises:
         URLError: If the request fails
         HTTPError: If the server returns an error status
     """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (respiratory-virus-dashboard/1.0)',
+        'Accept-Encoding': 'gzip',
+    }
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    
     try:
-        req = Request(url, headers={
-            'User-Agent': 'Mozilla/5.0 (respiratory-virus-dashboard/1.0)',
-        })
-        with urlopen(req, timeout=timeout) as response:
-            content = response.read().decode('utf-8')
-            return content
-    except (URLError, HTTPError) as e:
+        response = urlopen(Request(url, headers=headers), timeout=timeout)
+    except HTTPError as e:
+        if e.code == 304:
+            e.close()
+            return None
+        print(f"ERROR: Failed to fetch {url}: {e}", file=sys.stderr)
+        raise
+    except URLError as e:
         print(f"ERROR: Failed to fetch {url}: {e}", file=sys.stderr)
         raise
+    
+    if response.headers.get('Content-Encoding', '').lower() == 'gzip':
+        return GzipResponse(response)
+    return response
+
+
+def load_http_validators(path: Path, url: str) -> Dict[str, str]:
+    """
+    Load the cached ETag/Last-Modified of the last download of a URL.
+
+    Args:
+        path: Validators sidecar file
+        url: URL the validators must belong to
+
+    Returns:
+        Dictionary with 'etag' and/or 'last_modified' keys; empty if there
+        is no usable cache entry for this URL
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if not isinstance(cached, dict) or cached.get('url') != url:
+        return {}
+    return {key: cached[key] for key in ('etag', 'last_modified') if cached.get(key)}
+
+
+def save_http_validators(path: Path, url: str, headers: Any) -> None:
+    """
+    Store the ETag/Last-Modified response headers of a download of a URL.
+
+    Args:
+        path: Validators sidecar file
+        url: URL that was downloaded
+        headers: Response headers (mapping with a ``get`` method)
+    """
+    validators = {
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+    }
+    if not any(validators.values()):
+        path.unlink(missing_ok=True)
+        return
+    
+    path.write_text(json.dumps({'url': url, **validators}) + '\n', encoding='utf-8')
+
+
+def fetch_csv_text(url: str, timeout: int = 30) -> str:
+    """
+    Fetch CSV content from a URL as a single string.
+
+    Legacy helper kept for ad-hoc use and tests; the ETL itself streams
+    the response through open_csv_stream() instead.
 
+    Args:
+        url: The URL to fetch from
+        timeout: Request timeout in seconds
 
+    Returns:
+        CSV content as string
+
+    Raises:
+        URLError: If the request fails
+        HTTPError: If the server returns an error status
+    """
+    with open_csv_stream(url, timeout=timeout) as response:
+        return response.read().decode('utf-8')
+
+
+@lru_cache(maxsize=8192)
 def parse_iso_week(date_str: str) -> str:
     """
     Parse a date string and return ISO week format (YYYY-Www).
 
+    The likely format is sniffed from the separator and year position so
+    that usually a single strptime call is needed; results are memoized
+    since surveillance feeds repeat the same dates many times.
+
     Args:
         date_str: Date string in format YYYY-MM-DD or similar
 
@@ -79,8 +247,14 @@ def parse_iso_week(date_str: str) -> str:
         ValueError: If date string cannot be parsed
     """
     try:
-        # Try common date formats
-        for fmt in ["%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d-%m-%Y"]:
+        sep = '/' if '/' in date_str else '-'
+        if date_str[:4].isdigit() and date_str[4:5] == sep:
+            guess = f"%Y{sep}%m{sep}%d"
+        else:
+            guess = f"%d{sep}%m{sep}%Y"
+        
+        # Try the sniffed format first, then the other common formats
+        for fmt in (guess,) + tuple(f for f in DATE_FORMATS if f != guess):
             try:
                 date_obj = datetime.datetime.strptime(date_str, fmt)
                 iso_year, iso_week, _ = date_obj.isocalendar()
@@ -93,6 +267,46 @@ def parse_iso_week(date_str: str) -> str:
         raise
 
 
+def normalize_pathogen(pathogen_raw: str) -> str:
+    """
+    Map an ECDC pathogen label to its standard name.
+
+    Args:
+        pathogen_raw: Pathogen label as found in the CSV
+
+    Returns:
+        'influenza', 'RSV' or 'SARS-CoV-2', or the stripped label if unknown
+    """
+    pathogen_raw = pathogen_raw.strip()
+    pathogen_lower = pathogen_raw.lower()
+    for keywords, pathogen in PATHOGEN_KEYWORDS:
+        for keyword in keywords:
+            if keyword in pathogen_lower:
+                return pathogen
+    return pathogen_raw
+
+
+def classify_indicator(indicator_raw: str) -> Optional[str]:
+    """
+    Map an ECDC indicator label to a standard metric.
+
+    Args:
+        indicator_raw: Indicator label as found in the CSV
+
+    Returns:
+        'positivity_rate', 'cases' or 'tests', or None for unknown indicators
+    """
+    indicator = indicator_raw.strip().lower()
+    metric = INDICATOR_METRICS.get(indicator)
+    if metric is not None:
+        return metric
+    for keywords, metric in INDICATOR_KEYWORDS:
+        for keyword in keywords:
+            if keyword in indicator:
+                return metric
+    return None
+
+
 def validate_required_columns(headers: List[str], required: List[str], source_name: str) -> None:
     """
     Validate that all required columns are present in CSV headers.
@@ -118,7 +332,73 @@ def validate_required_columns(headers: List[str], required: List[str], source_na
         )
 
 
-def build_ecdc_weekly(csv_text: str) -> List[Dict[str, Any]]:
+@dataclass(slots=True, frozen=True)
+class Record:
+    """One weekly surveillance value; fields follow RECORD_KEYS order."""
+    source: str
+    iso_week: str
+    country: str
+    pathogen: str
+    metric: str
+    value: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record as a JSON-ready dict with keys in RECORD_KEYS order."""
+        return {
+            'source': self.source,
+            'iso_week': self.iso_week,
+            'country': self.country,
+            'pathogen': self.pathogen,
+            'metric': self.metric,
+            'value': self.value
+        }
+
+
+def make_record(iso_week: str, pathogen: str, metric: str, value: float) -> Record:
+    """
+    Build an ECDC output record for Italy.
+
+    Args:
+        iso_week: ISO week string (YYYY-Www)
+        pathogen: Standard pathogen name
+        metric: Standard metric name
+        value: Numeric value
+
+    Returns:
+        Record instance
+    """
+    return Record('ECDC', iso_week, 'IT', pathogen, metric, value)
+
+
+@lru_cache(maxsize=32)
+def resolve_ecdc_columns(fieldnames: Tuple[str, ...]) -> Tuple[int, ...]:
+    """
+    Resolve flexible ECDC column names to column positions.
+
+    Args:
+        fieldnames: CSV header row
+
+    Returns:
+        Column positions for each key of HEADER_VARIANTS, in the same order
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    headers_lower = {h.lower().strip(): i for i, h in enumerate(fieldnames)}
+    
+    positions = []
+    for column, variants in HEADER_VARIANTS.items():
+        for variant in variants:
+            if variant in headers_lower:
+                positions.append(headers_lower[variant])
+                break
+        else:
+            raise ValueError(f"ECDC CSV missing {column} column. Headers: {list(fieldnames)}")
+    
+    return tuple(positions)
+
+
+def build_ecdc_weekly(csv_source: Union[str, BinaryIO]) -> List[Record]:
     """
     Parse ECDC ERVISS CSV and build weekly JSONL records.
 
@@ -131,134 +411,112 @@ def build_ecdc_weekly(csv_text: str) -> List[Dict[str, Any]]:
     - value: numeric value
 
     Args:
-        csv_text: CSV content as string
+        csv_source: CSV content as string, or a binary stream (e.g. an
+            HTTP response) that is decoded incrementally as it is read
 
     Returns:
-        List of dictionaries with standardized schema
+        List of Record instances with standardized schema
 
     Raises:
         ValueError: If required columns are missing or data is invalid
     """
-    reader = csv.DictReader(StringIO(csv_text))
-    
-    if reader.fieldnames is None:
-        raise ValueError("ECDC CSV has no headers")
+    if isinstance(csv_source, str):
+        return _build_ecdc_weekly(csv.reader(StringIO(csv_source)))
     
-    # Map flexible column names to standard names
-    header_map = {}
-    headers_lower = {h.lower().strip(): h for h in reader.fieldnames}
-    
-    # Country - check for 'countryname' or alternatives
-    for variant in ['countryname', 'country_name', 'country', 'countrycode']:
-        if variant in headers_lower:
-            header_map['country'] = headers_lower[variant]
-            break
-    
-    # Pathogen
-    for variant in ['pathogen', 'virus', 'organism']:
-        if variant in headers_lower:
-            header_map['pathogen'] = headers_lower[variant]
-            break
-    
-    # Week - ECDC uses 'yearweek'
-    for variant in ['yearweek', 'year_week', 'iso_week', 'week', 'date']:
-        if variant in headers_lower:
-            header_map['yearweek'] = headers_lower[variant]
-            break
+    text = TextIOWrapper(csv_source, encoding='utf-8', newline='')
+    try:
+        return _build_ecdc_weekly(csv.reader(text))
+    finally:
+        # Leave closing the underlying stream to its owner
+        text.detach()
+
+
+def _build_ecdc_weekly(reader: Iterator[List[str]]) -> List[Record]:
+    """Build weekly records from an ECDC CSV row iterator (header first)."""
+    fieldnames = next(reader, None)
     
-    # Indicator (metric type)
-    for variant in ['indicator', 'metric', 'measure']:
-        if variant in headers_lower:
-            header_map['indicator'] = headers_lower[variant]
-            break
+    if fieldnames is None:
+        raise ValueError("ECDC CSV has no headers")
     
-    # Value
-    for variant in ['value', 'val', 'number']:
-        if variant in headers_lower:
-            header_map['value'] = headers_lower[variant]
-            break
+    country_idx, pathogen_idx, week_idx, indicator_idx, value_idx = (
+        resolve_ecdc_columns(tuple(fieldnames))
+    )
+    min_len = max(country_idx, pathogen_idx, week_idx, indicator_idx, value_idx) + 1
     
-    # Check required fields
-    if 'country' not in header_map:
-        raise ValueError(f"ECDC CSV missing country column. Headers: {list(reader.fieldnames)}")
-    if 'pathogen' not in header_map:
-        raise ValueError(f"ECDC CSV missing pathogen column. Headers: {list(reader.fieldnames)}")
-    if 'yearweek' not in header_map:
-        raise ValueError(f"ECDC CSV missing yearweek column. Headers: {list(reader.fieldnames)}")
-    if 'indicator' not in header_map:
-        raise ValueError(f"ECDC CSV missing indicator column. Headers: {list(reader.fieldnames)}")
-    if 'value' not in header_map:
-        raise ValueError(f"ECDC CSV missing value column. Headers: {list(reader.fieldnames)}")
+    # Country/pathogen/week/indicator columns hold few distinct labels, so
+    # their normalization is memoized per raw cell value and the row loop
+    # does no string processing of its own. This also dictionary-encodes
+    # them: all records share one string object per distinct pathogen,
+    # week and metric.
+    italy_cache: Dict[str, bool] = {}
+    pathogen_cache: Dict[str, str] = {}
+    week_cache: Dict[str, Optional[str]] = {}
+    metric_cache: Dict[str, Optional[str]] = {}
+    missing_values = MISSING_VALUES
+    isfinite = math.isfinite
     
     results = []
     for row in reader:
-        # Filter to Italy only
-        country = row[header_map['country']].strip()
-        if country.upper() not in ['IT', 'ITA', 'ITALY']:
+        # Skip short/ragged rows
+        if len(row) < min_len:
             continue
         
-        # Get pathogen and normalize
-        pathogen_raw = row[header_map['pathogen']].strip()
+        # Filter to Italy only, before touching any other column
+        country_raw = row[country_idx]
+        try:
+            is_italy = italy_cache[country_raw]
+        except KeyError:
+            is_italy = italy_cache[country_raw] = country_raw.strip().upper() in ITALY_CODES
+        if not is_italy:
+            continue
         
-        # Normalize pathogen names
-        pathogen_lower = pathogen_raw.lower()
-        if 'influenza' in pathogen_lower:
-            pathogen = 'influenza'
-        elif 'rsv' in pathogen_lower or 'respiratory syncytial' in pathogen_lower:
-            pathogen = 'RSV'
-        elif 'covid' in pathogen_lower or 'sars' in pathogen_lower or 'cov-2' in pathogen_lower:
-            pathogen = 'SARS-CoV-2'
-        else:
-            pathogen = pathogen_raw
+        # Get pathogen and normalize
+        pathogen_raw = row[pathogen_idx]
+        try:
+            pathogen = pathogen_cache[pathogen_raw]
+        except KeyError:
+            pathogen = pathogen_cache[pathogen_raw] = normalize_pathogen(pathogen_raw)
         
         # Get ISO week (already in correct format from ECDC)
-        iso_week = row[header_map['yearweek']].strip()
-        if not iso_week or not ISO_WEEK_PATTERN.match(iso_week):
+        week_raw = row[week_idx]
+        try:
+            iso_week = week_cache[week_raw]
+        except KeyError:
+            iso_week = week_raw.strip()
+            if not ISO_WEEK_PATTERN.match(iso_week):
+                iso_week = None
+            week_cache[week_raw] = iso_week
+        if iso_week is None:
             continue
         
-        # Get indicator and normalize
-        indicator = row[header_map['indicator']].strip().lower()
-        
         # Map ECDC indicators to our standard metrics
-        if indicator == 'positivity':
-            metric = 'positivity_rate'
-        elif indicator == 'detections':
-            metric = 'cases'
-        elif indicator == 'tests':
-            metric = 'tests'
-        elif 'positivity' in indicator or 'percent' in indicator:
-            metric = 'positivity_rate'
-        elif 'detection' in indicator or 'case' in indicator or 'positive' in indicator:
-            metric = 'cases'
-        elif 'test' in indicator or 'specimen' in indicator:
-            metric = 'tests'
-        else:
+        indicator_raw = row[indicator_idx]
+        try:
+            metric = metric_cache[indicator_raw]
+        except KeyError:
+            metric = metric_cache[indicator_raw] = classify_indicator(indicator_raw)
+        if metric is None:
             # Skip unknown indicators
             continue
         
-        # Get value
-        val_str = row[header_map['value']].strip()
-        if not val_str or val_str in ['', 'NA', 'N/A', 'null', 'None']:
+        # Get value (float() ignores surrounding whitespace itself)
+        val_str = row[value_idx]
+        if val_str in missing_values:
             continue
         
         try:
             value = float(val_str)
-            if value < 0:
-                continue
-            if metric == 'positivity_rate' and value > 100:
-                continue
-        except (ValueError, TypeError):
+        except ValueError:
+            continue
+        
+        # Reject NaN/inf, negatives and impossible percentages
+        if not isfinite(value) or value < 0:
+            continue
+        if value > 100 and metric == 'positivity_rate':
             continue
         
         # Create record
-        results.append({
-            'source': 'ECDC',
-            'iso_week': iso_week,
-            'country': 'IT',
-            'pathogen': pathogen,
-            'metric': metric,
-            'value': value
-        })
+        results.append(make_record(iso_week, pathogen, metric, value))
     
     if not results:
         print("WARNING: No ECDC records extracted for Italy", file=sys.stderr)
@@ -268,27 +526,58 @@ def build_ecdc_weekly(csv_text: str) -> List[Dict[str, Any]]:
 
 
 
-def compute_content_hash(records: List[Dict[str, Any]]) -> str:
+def serialize_jsonl(records: List[Record]) -> bytes:
     """
-    Compute a hash of the record content for change detection.
+    Serialize records to JSONL bytes (one JSON object per line).
+
+    Lines are rendered straight from the record fields into a fixed
+    template, without building an intermediate dict per record. The
+    output is identical to json.dumps(record.as_dict(), ensure_ascii=False)
+    for finite float values.
 
     Args:
         records: List of data records
 
     Returns:
-        SHA256 hash of the serialized content
+        UTF-8 encoded JSONL content, exactly as written to disk
+    """
+    template = JSONL_LINE_TEMPLATE
+    quote = encode_basestring
+    number = repr
+    return ''.join([
+        template % (
+            quote(r.source), quote(r.iso_week), quote(r.country),
+            quote(r.pathogen), quote(r.metric), number(r.value)
+        )
+        for r in records
+    ]).encode('utf-8')
+
+
+def compute_content_hash(content: bytes) -> str:
+    """
+    Compute a hash of serialized JSONL content for change detection.
+
+    Args:
+        content: JSONL bytes as produced by serialize_jsonl()
+
+    Returns:
+        Hex digest of the content (CONTENT_HASH_ALGORITHM)
     """
-    content = json.dumps(records, sort_keys=True, ensure_ascii=False)
-    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return hashlib.new(CONTENT_HASH_ALGORITHM, content).hexdigest()
 
 
-def write_jsonl(path: Path, records: List[Dict[str, Any]]) -> bool:
+def write_jsonl(path: Path, records: List[Record]) -> bool:
     """
     Write records to JSONL file atomically with change detection.
 
+    Records are serialized once; the same bytes are hashed and written.
+    The content hash is stored in a ``<name>.hash`` sidecar next to the
+    output, so an unchanged run only reads that small file. Without a
+    sidecar, the existing file's raw bytes are hashed instead.
+
     Args:
         path: Output file path
-        records: List of dictionaries to write
+        records: List of records to write
 
     Returns:
         True if file was written (new or changed), False if unchanged
@@ -296,69 +585,67 @@ def write_jsonl(path: Path, records: List[Dict[str, Any]]) -> bool:
     Raises:
         IOError: If write fails
     """
+    payload = serialize_jsonl(records)
+    hash_path = path.with_name(path.name + '.hash')
+    
     # Check if content has changed
-    new_hash = compute_content_hash(records)
+    new_hash = compute_content_hash(payload)
     
     if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            existing_records = [json.loads(line) for line in f if line.strip()]
-            existing_hash = compute_content_hash(existing_records)
-            
-            if existing_hash == new_hash:
-                print(f"INFO: {path.name} unchanged, skipping write")
-                return False
+        if hash_path.exists():
+            existing_hash = hash_path.read_text(encoding='utf-8').strip()
+        else:
+            with open(path, 'rb') as f:
+                existing_hash = hashlib.file_digest(f, CONTENT_HASH_ALGORITHM).hexdigest()
+        
+        if existing_hash == new_hash:
+            print(f"INFO: {path.name} unchanged, skipping write")
+            if not hash_path.exists():
+                hash_path.write_text(new_hash + '\n', encoding='utf-8')
+            return False
     
     # Write atomically using temp file
     path.parent.mkdir(parents=True, exist_ok=True)
     
     with tempfile.NamedTemporaryFile(
-        mode='w',
-        encoding='utf-8',
+        mode='wb',
         delete=False,
         dir=path.parent,
         prefix=f".{path.name}.",
         suffix='.tmp'
     ) as tmp:
-        for record in records:
-            json.dump(record, tmp, ensure_ascii=False)
-            tmp.write('\n')
         tmp_path = tmp.name
+        try:
+            # One write of the whole payload, flushed to disk before the rename
+            tmp.write(payload)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp_path)
+            raise
     
-    # Atomic rename
+    # Atomic rename, then record the hash of what is now on disk
     os.replace(tmp_path, path)
+    hash_path.write_text(new_hash + '\n', encoding='utf-8')
     print(f"INFO: Wrote {len(records)} records to {path}")
     return True
 
 
-def generate_mock_ecdc_data() -> List[Dict[str, Any]]:
-    """Generate mock ECDC data for testing."""
-    results = []
+def generate_mock_ecdc_data(weeks: int = 52) -> List[Record]:
+    """Generate mock ECDC data for testing, one record per series and week."""
     base_date = datetime.date.today()
+    results = []
     
-    for weeks_ago in range(52, 0, -1):
+    for weeks_ago in range(weeks, 0, -1):
         week_date = base_date - datetime.timedelta(weeks=weeks_ago)
         iso_year, iso_week, _ = week_date.isocalendar()
         iso_week_str = f"{iso_year}-W{iso_week:02d}"
         
-        # Mock influenza data
-        results.append({
-            'source': 'ECDC',
-            'iso_week': iso_week_str,
-            'country': 'IT',
-            'pathogen': 'influenza',
-            'metric': 'positivity_rate',
-            'value': 5.0 + (weeks_ago % 10) * 2.5
-        })
-        
-        # Mock RSV data
-        results.append({
-            'source': 'ECDC',
-            'iso_week': iso_week_str,
-            'country': 'IT',
-            'pathogen': 'RSV',
-            'metric': 'cases',
-            'value': 50.0 + (weeks_ago % 15) * 10.0
-        })
+        results.extend([
+            make_record(iso_week_str, pathogen, metric, base + (weeks_ago % cycle) * step)
+            for pathogen, metric, base, cycle, step in MOCK_SERIES
+        ])
     
     return results
 
@@ -394,27 +681,44 @@ def main() -> int:
     if args.mock and args.real:
         parser.error("Cannot specify both --mock and --real")
     
+    ecdc_path = DATA_DIR / "ecdc_weekly.jsonl"
+    validators_path = ecdc_path.with_name(ecdc_path.name + '.http')
+    source_headers = None
+    
     try:
         if args.mock:
             print("INFO: Generating mock data...")
             ecdc_records = generate_mock_ecdc_data()
+            # Cached validators no longer describe the file contents
+            validators_path.unlink(missing_ok=True)
         else:
             # Get URL from environment or use default
             ecdc_url = os.environ.get('ECDC_CSV_URL', DEFAULT_ECDC_URL)
+            validators = load_http_validators(validators_path, ecdc_url) if ecdc_path.exists() else {}
             
             print(f"INFO: Fetching ECDC data from {ecdc_url}")
             try:
-                ecdc_csv = fetch_csv_text(ecdc_url)
-                ecdc_records = build_ecdc_weekly(ecdc_csv)
+                ecdc_csv = open_csv_stream(
+                    ecdc_url,
+                    etag=validators.get('etag'),
+                    last_modified=validators.get('last_modified'),
+                )
+                if ecdc_csv is None:
+                    print("INFO: ECDC source not modified since last download, skipping")
+                    return 0
+                with ecdc_csv:
+                    ecdc_records = build_ecdc_weekly(ecdc_csv)
+                    source_headers = ecdc_csv.headers
             except Exception as e:
                 print(f"ERROR: Failed to fetch/parse ECDC data: {e}", file=sys.stderr)
                 return 1
         
         # Write output file
-        ecdc_path = DATA_DIR / "ecdc_weekly.jsonl"
-        
         ecdc_changed = write_jsonl(ecdc_path, ecdc_records)
         
+        if source_headers is not None:
+            save_http_validators(validators_path, ecdc_url, source_headers)
+        
         if ecdc_changed:
             print("INFO: Data files updated successfully")
             return 0
@@ -8,7 +8,7 @@ Ensures data quality and adherence to defined schemas before publication.
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 
 # Path to data directory
@@ -19,15 +19,16 @@ VALID_SOURCES = {'ECDC'}
 VALID_PATHOGENS = {'influenza', 'RSV', 'SARS-CoV-2'}
 VALID_METRICS = {'positivity_rate', 'cases', 'tests'}
 ISO_WEEK_PATTERN = re.compile(r'^\d{4}-W\d{2}$')
+REQUIRED_FIELDS = ('source', 'iso_week', 'country', 'pathogen', 'metric', 'value')
 
 
-def load_jsonl(path: Path, max_lines: int = 100) -> List[Dict[str, Any]]:
+def load_jsonl(path: Path, max_lines: Optional[int] = 100) -> List[Dict[str, Any]]:
     """
     Load JSONL file and return records.
 
     Args:
         path: Path to JSONL file
-        max_lines: Maximum number of lines to read (default 100)
+        max_lines: Maximum number of lines to read (default 100, None for all)
 
     Returns:
         List of parsed JSON objects
@@ -43,7 +44,7 @@ def load_jsonl(path: Path, max_lines: int = 100) -> List[Dict[str, Any]]:
     
     with open(path, 'r', encoding='utf-8') as f:
         for i, line in enumerate(f):
-            if i >= max_lines:
+            if max_lines is not None and i >= max_lines:
                 break
             
             line = line.strip()
@@ -72,8 +73,7 @@ def validate_ecdc_record(record: Dict[str, Any], line_num: int) -> None:
         KeyError: If required field is missing
     """
     # Required fields
-    required_fields = ['source', 'iso_week', 'country', 'pathogen', 'metric', 'value']
-    for field in required_fields:
+    for field in REQUIRED_FIELDS:
         assert field in record, f"Line {line_num}: Missing required field '{field}'"
     
     # Source
@@ -118,12 +118,24 @@ def test_ecdc_weekly_schema():
     print("Testing ECDC weekly data schema...")
     
     ecdc_path = DATA_DIR / "ecdc_weekly.jsonl"
-    records = load_jsonl(ecdc_path, max_lines=100)
+    records = load_jsonl(ecdc_path, max_lines=None)
     
     assert len(records) > 0, "ECDC weekly file is empty"
+    assert list(records[0].keys()) == list(REQUIRED_FIELDS), \
+        f"Unexpected field order {list(records[0].keys())}, expected {list(REQUIRED_FIELDS)}"
     
+    # Validate the whole file and report all failures, not just the first
+    violations = []
     for i, record in enumerate(records, start=1):
-        validate_ecdc_record(record, i)
+        try:
+            validate_ecdc_record(record, i)
+        except (AssertionError, KeyError) as e:
+            violations.append(str(e))
+    
+    assert not violations, (
+        f"{len(violations)} of {len(records)} ECDC records invalid, first: "
+        + "; ".join(violations[:5])
+    )
     
     print(f"[OK] Validated {len(records)} ECDC records")
 